@@ -0,0 +1,459 @@
+"""
+Pexus Payment Gateway - HTTP Load Test
+Starts the Flask app against a local PostgreSQL, drives a weighted mix of
+customer traffic at a fixed concurrency, reports throughput and latency
+percentiles per route, checks ledger invariants and writes the results as
+JSON so runs can be compared.
+
+Usage:
+    python bench/loadtest.py --duration 60 --concurrency 16
+    python bench/loadtest.py --database-url postgresql://postgres@localhost:5432/pexus_bench?sslmode=disable
+    python bench/loadtest.py --baseline bench/results/loadtest-20240101-120000.json
+
+Without --database-url a throwaway cluster is created with initdb/pg_ctl
+(found on PATH or in $PG_BIN) and removed afterwards.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import uuid
+from datetime import datetime
+
+import pg8000
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, 'bench', 'results')
+
+CUSTOMERS = ['alice', 'bob', 'carol', 'david', 'eve']
+MERCHANTS = ['merchant_amazon', 'merchant_flipkart', 'merchant_swiggy', 'merchant_zomato']
+DEFAULT_MIX = ('dashboard=20,api_balance=20,transactions=10,api_transactions=10,'
+               'summary=5,index=5,payment=20,refund=5,login=5')
+
+# ============================================
+# LOCAL POSTGRES
+# ============================================
+
+def free_port():
+    """Ask the OS for an unused TCP port"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def find_pg_binary(name):
+    """Locate a PostgreSQL server binary in $PG_BIN or on PATH"""
+    if os.environ.get('PG_BIN'):
+        candidate = os.path.join(os.environ['PG_BIN'], name)
+        if os.path.exists(candidate):
+            return candidate
+    found = shutil.which(name)
+    if not found:
+        raise SystemExit(f'{name} not found: install PostgreSQL, set PG_BIN or pass --database-url')
+    return found
+
+class LocalPostgres:
+    """Throwaway PostgreSQL cluster listening on 127.0.0.1 with trust auth"""
+
+    def __init__(self):
+        self.data_dir = tempfile.mkdtemp(prefix='pexus-pg-')
+        self.port = free_port()
+
+    @property
+    def url(self):
+        return f'postgresql://postgres@127.0.0.1:{self.port}/pexus_bench?sslmode=disable'
+
+    def start(self):
+        subprocess.run([find_pg_binary('initdb'), '-D', self.data_dir, '-U', 'postgres',
+                        '-A', 'trust', '--no-sync'], check=True, stdout=subprocess.DEVNULL)
+        options = f'-p {self.port} -c listen_addresses=127.0.0.1 -c fsync=off -c max_connections=200'
+        subprocess.run([find_pg_binary('pg_ctl'), '-D', self.data_dir, '-o', options,
+                        '-l', os.path.join(self.data_dir, 'server.log'), '-w', 'start'],
+                       check=True, stdout=subprocess.DEVNULL)
+        conn = pg8000.connect(user='postgres', host='127.0.0.1', port=self.port, database='postgres')
+        conn.autocommit = True
+        conn.run('CREATE DATABASE pexus_bench')
+        conn.close()
+
+    def stop(self):
+        subprocess.run([find_pg_binary('pg_ctl'), '-D', self.data_dir, '-m', 'fast', 'stop'],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+def connect(database_url):
+    """Open a pg8000 connection from a postgresql:// URL"""
+    url = urllib.parse.urlsplit(database_url)
+    query = urllib.parse.parse_qs(url.query)
+    return pg8000.connect(
+        user=urllib.parse.unquote(url.username or 'postgres'),
+        password=urllib.parse.unquote(url.password) if url.password else None,
+        host=url.hostname or '127.0.0.1',
+        port=url.port or 5432,
+        database=url.path.lstrip('/') or 'postgres',
+        ssl_context=None if query.get('sslmode') == ['disable'] else True
+    )
+
+# ============================================
+# APP SERVER
+# ============================================
+
+def start_app(database_url, port, pool_size, log_path):
+    """Run the Flask app in a subprocess and wait until it answers"""
+    # Eager init so the schema exists before the invariant snapshot is taken
+    env = dict(os.environ, DATABASE_URL=database_url, PEXUS_POOL_MAX_SIZE=str(pool_size), PEXUS_INIT_MODE='eager')
+    log = open(log_path, 'w')
+    process = subprocess.Popen(
+        [sys.executable, '-c',
+         f"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True, debug=False)"],
+        cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f'App exited during startup, see {log_path}')
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/payment-methods')
+            if conn.getresponse().status == 200:
+                return process
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f'App did not become ready, see {log_path}')
+
+# ============================================
+# VIRTUAL USERS
+# ============================================
+
+class VirtualUser:
+    """One logged-in customer with its own session cookie"""
+
+    def __init__(self, host, port, user_id):
+        self.host = host
+        self.port = port
+        self.user_id = user_id
+        self.cookie = None
+
+    def request(self, method, path, body=None, headers=None):
+        """Send one request without following redirects; returns (status, body)"""
+        headers = dict(headers or {})
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+        if body is not None:
+            body = urllib.parse.urlencode(body)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+            set_cookie = response.getheader('Set-Cookie')
+            if set_cookie:
+                self.cookie = set_cookie.split(';', 1)[0]
+            return response.status, data
+        finally:
+            conn.close()
+
+    def login(self):
+        return self.request('POST', '/login', {'user_id': self.user_id})
+
+    def payment(self):
+        receiver = random.choice([u for u in CUSTOMERS + MERCHANTS if u != self.user_id])
+        method = random.choice(['wallet', 'card', 'upi', 'netbanking'])
+        form = {
+            'receiver_id': receiver,
+            'amount': f'{random.uniform(1, 250):.2f}',
+            'method_type': method,
+            'description': 'load test'
+        }
+        if method == 'card':
+            form.update(card_number='4111 1111 1111 1111', card_holder='Load Test', expiry='12/30', cvv='123')
+        elif method == 'upi':
+            form.update(upi_id=f'{self.user_id}@okbench')
+        elif method == 'netbanking':
+            form.update(bank_name='Bench Bank', account_number='000123456789', ifsc='BNCH0000001')
+        return self.request('POST', '/payment', form, {'Idempotency-Key': uuid.uuid4().hex})
+
+    def refundable_transaction(self):
+        """Find one of this user's refundable payments through the JSON API"""
+        status, data = self.request('GET', '/api/transactions?limit=20')
+        if status != 200:
+            return status, None
+        for t in json.loads(data).get('transactions', []):
+            if t['sender_id'] == self.user_id and t['status'] == 'success' and not t['refunded']:
+                return status, t['transaction_id']
+        return status, None
+
+ROUTES = {
+    'index': lambda u: u.request('GET', '/'),
+    'login': lambda u: u.login(),
+    'dashboard': lambda u: u.request('GET', '/dashboard'),
+    'transactions': lambda u: u.request('GET', '/transactions'),
+    'summary': lambda u: u.request('GET', '/summary'),
+    'api_balance': lambda u: u.request('GET', '/api/balance'),
+    'api_transactions': lambda u: u.request('GET', '/api/transactions'),
+    'payment': lambda u: u.payment(),
+}
+
+def parse_mix(spec):
+    """Parse 'route=weight,...' into (routes, weights)"""
+    routes, weights = [], []
+    for part in spec.split(','):
+        name, weight = part.split('=')
+        if name not in ROUTES and name != 'refund':
+            raise SystemExit(f'Unknown route in mix: {name}')
+        routes.append(name)
+        weights.append(float(weight))
+    return routes, weights
+
+def run_worker(host, port, user_id, routes, weights, stop_at, samples, lock):
+    """Issue requests from one virtual user until stop_at"""
+    user = VirtualUser(host, port, user_id)
+    user.login()
+    local = []
+    while time.monotonic() < stop_at:
+        route = random.choices(routes, weights)[0]
+        started = time.perf_counter()
+        try:
+            if route == 'refund':
+                status, transaction_id = user.refundable_transaction()
+                local.append(('api_transactions', time.perf_counter() - started, status < 400))
+                if not transaction_id:
+                    continue
+                started = time.perf_counter()
+                status, _ = user.request('POST', '/refund', {'transaction_id': transaction_id},
+                                         {'Idempotency-Key': uuid.uuid4().hex})
+            else:
+                status, _ = ROUTES[route](user)
+            ok = status < 400
+        except OSError:
+            ok = False
+        local.append((route, time.perf_counter() - started, ok))
+    with lock:
+        samples.extend(local)
+
+# ============================================
+# REPORTING
+# ============================================
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(samples, elapsed):
+    """Per-route throughput and latency percentiles (ms)"""
+    by_route = {}
+    for route, latency, ok in samples:
+        by_route.setdefault(route, []).append((latency, ok))
+
+    routes = {}
+    for route, values in sorted(by_route.items()):
+        latencies = sorted(v[0] * 1000 for v in values)
+        routes[route] = {
+            'requests': len(values),
+            'errors': sum(1 for v in values if not v[1]),
+            'throughput_rps': round(len(values) / elapsed, 2),
+            'mean_ms': round(sum(latencies) / len(latencies), 2),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'max_ms': round(latencies[-1], 2)
+        }
+    total = len(samples)
+    return {
+        'requests': total,
+        'errors': sum(1 for s in samples if not s[2]),
+        'throughput_rps': round(total / elapsed, 2) if elapsed else 0
+    }, routes
+
+# Per-wallet totals: the main row plus any stripe rows of high-volume merchants
+WALLET_TOTALS_SQL = '''
+    SELECT w.balance + COALESCE((SELECT SUM(s.balance) FROM nexus_wallet_stripes s
+                                 WHERE s.user_id = w.user_id), 0) AS balance
+    FROM nexus_wallets w
+'''
+
+def ledger_snapshot(database_url):
+    """Total money in wallets, read straight from the database"""
+    conn = connect(database_url)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT COALESCE(SUM(balance), 0) FROM ({WALLET_TOTALS_SQL}) AS wallets')
+        return cursor.fetchone()[0]
+    finally:
+        conn.close()
+
+def check_invariants(database_url, initial_total):
+    """Verify the ledger after the run; every check must hold"""
+    conn = connect(database_url)
+    checks = {}
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT COALESCE(SUM(balance), 0), COUNT(*) FILTER (WHERE balance < 0) FROM ({WALLET_TOTALS_SQL}) AS wallets')
+        total, negative = cursor.fetchone()
+        checks['money_conserved'] = {'ok': total == initial_total,
+                                     'initial': str(initial_total), 'final': str(total)}
+        checks['no_negative_balances'] = {'ok': negative == 0, 'negative_wallets': negative}
+
+        cursor.execute('''
+            SELECT COUNT(*) FROM nexus_transactions_all t
+            WHERE t.refunded <> EXISTS (SELECT 1 FROM nexus_refunds_all r WHERE r.transaction_id = t.transaction_id)
+        ''')
+        mismatched = cursor.fetchone()[0]
+        checks['refunds_recorded_once'] = {'ok': mismatched == 0, 'mismatched_transactions': mismatched}
+
+        cursor.execute('''
+            SELECT (SELECT COALESCE(SUM(total_transactions), 0) FROM nexus_counters),
+                   (SELECT COUNT(*) FROM nexus_transactions_all)
+        ''')
+        counted, actual = cursor.fetchone()
+        checks['counters_match'] = {'ok': counted == actual, 'counters': int(counted), 'actual': actual}
+
+        # Per-user rollup against a recount of the same figures
+        cursor.execute('''
+            WITH rollup AS (
+                SELECT user_id, SUM(total_transactions) AS total, SUM(successful_payments) AS successful,
+                       SUM(refunded_payments) AS refunded, SUM(total_volume) AS volume
+                FROM nexus_user_stats GROUP BY user_id HAVING SUM(total_transactions) > 0
+            ),
+            recount AS (
+                SELECT user_id, COUNT(*) AS total, COUNT(*) FILTER (WHERE status = 'success') AS successful,
+                       COUNT(*) FILTER (WHERE refunded) AS refunded,
+                       COALESCE(SUM(amount) FILTER (WHERE status = 'success'), 0) AS volume
+                FROM (SELECT sender_id AS user_id, status, refunded, amount FROM nexus_transactions_all
+                      UNION ALL
+                      SELECT receiver_id, status, refunded, amount FROM nexus_transactions_all
+                      WHERE receiver_id <> sender_id) AS sides
+                GROUP BY user_id
+            )
+            SELECT COUNT(*) FROM rollup FULL JOIN recount USING (user_id)
+            WHERE (rollup.total, rollup.successful, rollup.refunded, rollup.volume)
+                  IS DISTINCT FROM (recount.total, recount.successful, recount.refunded, recount.volume)
+        ''')
+        mismatched = cursor.fetchone()[0]
+        checks['user_stats_match'] = {'ok': mismatched == 0, 'mismatched_users': mismatched}
+
+        cursor.execute('''
+            SELECT (SELECT COALESCE(SUM(txn_count), 0) FROM nexus_analytics_hourly),
+                   (SELECT COALESCE(SUM(refund_count), 0) FROM nexus_analytics_hourly),
+                   (SELECT COUNT(*) FROM nexus_transactions_all),
+                   (SELECT COUNT(*) FROM nexus_transactions_all WHERE refunded)
+        ''')
+        cube_count, cube_refunds, actual, refunded = cursor.fetchone()
+        checks['analytics_match'] = {'ok': (cube_count, cube_refunds) == (actual, refunded),
+                                     'cube': [int(cube_count), int(cube_refunds)], 'actual': [actual, refunded]}
+    finally:
+        conn.close()
+    return checks
+
+def print_report(totals, routes, invariants, baseline=None):
+    print(f"\n{'route':<18}{'reqs':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+          + (f"{'Δp95':>9}" if baseline else ''))
+    for route, r in routes.items():
+        line = (f"{route:<18}{r['requests']:>8}{r['errors']:>6}{r['throughput_rps']:>9.1f}"
+                f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}")
+        if baseline and route in baseline.get('routes', {}):
+            line += f"{r['p95_ms'] - baseline['routes'][route]['p95_ms']:>+9.1f}"
+        print(line)
+    print(f"\nTotal: {totals['requests']} requests, {totals['errors']} errors, "
+          f"{totals['throughput_rps']} req/s")
+    for name, check in invariants.items():
+        print(f"{'✅' if check['ok'] else '❌'} {name}")
+
+# ============================================
+# MAIN
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Pexus HTTP load test')
+    parser.add_argument('--database-url', help='Existing database to use (default: throwaway local cluster)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of load (default 30)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent virtual users (default 8)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Weighted route mix (default {DEFAULT_MIX})')
+    parser.add_argument('--output', help='Results JSON path (default bench/results/loadtest-<time>.json)')
+    parser.add_argument('--baseline', help='Earlier results JSON to compare p95 latencies against')
+    parser.add_argument('--seed', type=int, help='Random seed for a repeatable request mix')
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    routes, weights = parse_mix(args.mix)
+
+    postgres = None
+    app_process = None
+    workdir = tempfile.mkdtemp(prefix='pexus-bench-')
+    database_url = args.database_url
+    try:
+        if not database_url:
+            postgres = LocalPostgres()
+            postgres.start()
+            database_url = postgres.url
+
+        port = free_port()
+        app_process = start_app(database_url, port, args.concurrency + 2, os.path.join(workdir, 'app.log'))
+        initial_total = ledger_snapshot(database_url)
+
+        print(f"🚀 {args.concurrency} users for {args.duration:.0f}s against http://127.0.0.1:{port}")
+        samples, lock = [], threading.Lock()
+        started = time.monotonic()
+        stop_at = started + args.duration
+        threads = [
+            threading.Thread(target=run_worker,
+                             args=('127.0.0.1', port, CUSTOMERS[i % len(CUSTOMERS)], routes, weights,
+                                   stop_at, samples, lock))
+            for i in range(args.concurrency)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - started
+
+        totals, route_stats = summarize(samples, elapsed)
+        invariants = check_invariants(database_url, initial_total)
+    finally:
+        if app_process:
+            app_process.terminate()
+            app_process.wait(timeout=10)
+        if postgres:
+            postgres.stop()
+
+    results = {
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'config': {'duration': args.duration, 'concurrency': args.concurrency, 'mix': args.mix,
+                   'local_postgres': postgres is not None},
+        'elapsed_seconds': round(elapsed, 2),
+        'totals': totals,
+        'routes': route_stats,
+        'invariants': invariants
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(totals, route_stats, invariants, baseline)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📄 Results written to {output}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    return 0 if all(check['ok'] for check in invariants.values()) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Pexus Payment Gateway - Round-Trip Budget Check
+Starts the Flask app, requests each page a few times and reads the
+pexus_request_db_round_trips histogram from /metrics to check that no
+request went over the page's budget of database round trips. The count
+includes pg8000's implicit BEGIN, the ROLLBACK sent when a connection goes
+back to the pool with a transaction open, and pool liveness pings.
+
+Usage:
+    python bench/roundtrips.py
+    python bench/roundtrips.py --database-url postgresql://postgres@localhost:5432/pexus_bench?sslmode=disable
+
+Exits non-zero when any page is over budget.
+"""
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import uuid
+
+from loadtest import LocalPostgres, VirtualUser, free_port, start_app
+
+# endpoint -> (path, session, round-trip budget); budgets must be histogram bucket bounds
+BUDGETS = {
+    'index': ('/', 'customer', 1),
+    'dashboard': ('/dashboard', 'customer', 1),
+    'summary': ('/summary', 'customer', 1),
+    'admin_dashboard': ('/admin', 'admin', 1),
+}
+
+METRIC_LINE = re.compile(r'^pexus_request_db_round_trips_(bucket|count)\{endpoint="([^"]+)"(?:,le="([^"]+)")?\} (\S+)$')
+
+def scrape(user, token):
+    """{endpoint: {'count': n, le: n}} from the round-trip histogram"""
+    status, data = user.request('GET', '/metrics', headers={'Authorization': f'Bearer {token}'})
+    if status != 200:
+        raise SystemExit(f'/metrics returned {status}')
+    histogram = {}
+    for line in data.decode().splitlines():
+        match = METRIC_LINE.match(line)
+        if match:
+            kind, endpoint, le, value = match.groups()
+            histogram.setdefault(endpoint, {})[le or kind] = float(value)
+    return histogram
+
+def main():
+    parser = argparse.ArgumentParser(description='Pexus round-trip budget check')
+    parser.add_argument('--database-url', help='Existing database to use (default: throwaway local cluster)')
+    parser.add_argument('--requests', type=int, default=5, help='Requests per page (default 5)')
+    args = parser.parse_args()
+
+    postgres = None
+    app_process = None
+    workdir = tempfile.mkdtemp(prefix='pexus-bench-')
+    token = uuid.uuid4().hex
+    os.environ['PEXUS_METRICS_TOKEN'] = token
+    database_url = args.database_url
+    try:
+        if not database_url:
+            postgres = LocalPostgres()
+            postgres.start()
+            database_url = postgres.url
+
+        port = free_port()
+        app_process = start_app(database_url, port, 4, os.path.join(workdir, 'app.log'))
+        customer = VirtualUser('127.0.0.1', port, 'alice')
+        customer.login()
+        admin = VirtualUser('127.0.0.1', port, 'admin')
+        admin.request('POST', '/admin-login', {'username': 'admin', 'password': 'pexus@2024'})
+        sessions = {'customer': customer, 'admin': admin}
+
+        # One warm-up request each so caches and pooled connections are primed
+        for path, session, _ in BUDGETS.values():
+            sessions[session].request('GET', path)
+        before = scrape(customer, token)
+        for path, session, _ in BUDGETS.values():
+            for _ in range(args.requests):
+                sessions[session].request('GET', path)
+        after = scrape(customer, token)
+    finally:
+        if app_process:
+            app_process.terminate()
+            app_process.wait(timeout=10)
+        if postgres:
+            postgres.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    failures = 0
+    print(f"{'Page':<18} {'Requests':>8} {'Budget':>6} {'Over':>5}")
+    for endpoint, (_, _, budget) in BUDGETS.items():
+        delta = lambda key: after.get(endpoint, {}).get(key, 0) - before.get(endpoint, {}).get(key, 0)
+        count = delta('count')
+        over = count - delta(str(budget))
+        ok = count > 0 and over == 0
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {endpoint:<16} {count:>8.0f} {budget:>6} {over:>5.0f}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
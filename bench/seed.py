@@ -0,0 +1,331 @@
+"""
+Pexus Payment Gateway - Bulk Data Seeder
+Fills a database with synthetic users, wallets, transactions and refunds for
+scale testing. Rows are generated lazily and streamed through
+COPY ... FROM STDIN in fixed-size batches, so memory stays flat no matter how
+many rows are requested.
+
+Distributions:
+    - a handful of hot merchants receive most merchant traffic (Zipf)
+    - senders follow a power law: a small share of customers sends most payments
+    - method mix of wallet/upi/card/netbanking, log-normal amounts
+    - ~97% success / 2% failed / 1% pending, a fraction of successes refunded
+
+Usage:
+    python bench/seed.py --database-url postgresql://postgres@localhost:5432/pexus_bench?sslmode=disable
+    python bench/seed.py --database-url ... --users 1000000 --transactions 10000000
+
+The schema is created by importing the app (init_db + migrations). Secondary
+indexes are dropped before the load and rebuilt afterwards unless
+--keep-indexes is given.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHUNK_ROWS = 5000  # rows per COPY data message
+SEED_WORKER_ID = 1023  # Snowflake worker id reserved for seeded rows
+METHOD_MIX = [('wallet', 35), ('upi', 40), ('card', 20), ('netbanking', 5)]
+STATUS_MIX = [('success', 97), ('failed', 2), ('pending', 1)]
+MERCHANT_SHARE = 0.7  # share of payments that go to a merchant
+BANKS = ['State Bank of India', 'HDFC Bank', 'ICICI Bank', 'Axis Bank', 'Kotak Mahindra Bank']
+UPI_HANDLES = ['okaxis', 'oksbi', 'okhdfcbank', 'ybl', 'paytm']
+DESCRIPTIONS = ['Groceries', 'Food order', 'Electronics', 'Bill payment', 'Rent share',
+                'Movie tickets', 'Travel booking', 'Subscription', 'Gift', None]
+REFUND_REASONS = ['Order cancelled', 'Item not delivered', 'Duplicate payment', 'Customer request']
+
+# ============================================
+# ROW GENERATORS
+# ============================================
+
+def customer_id(n):
+    return f'seed_c{n:08d}'
+
+def merchant_id(n):
+    return f'seed_m{n:05d}'
+
+def power_law_index(n, exponent):
+    """Index in [0, n) where low indexes are picked far more often"""
+    return min(n - 1, int(n * random.random() ** exponent))
+
+def zipf_cum_weights(n, s=1.1):
+    """Cumulative Zipf weights for random.choices over n ranks"""
+    total, weights = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** s
+        weights.append(total)
+    return weights
+
+def method_details_pool(size=64):
+    """Pre-rendered masked method_details JSON per method type"""
+    pool = {}
+    for method_type, _ in METHOD_MIX:
+        variants = []
+        for _ in range(size):
+            code = ''.join(random.choices('0123456789ABCDEF', k=8))
+            if method_type == 'wallet':
+                details = {'method': 'wallet', 'wallet_id_masked': 'PXS****', 'approval_code': code}
+            elif method_type == 'card':
+                details = {'method': 'card', 'card_number_masked': f'**** **** **** {random.randint(0, 9999):04d}',
+                           'card_holder': 'Seed Customer', 'auth_code': code}
+            elif method_type == 'upi':
+                details = {'method': 'upi', 'upi_id_masked': f'us****@{random.choice(UPI_HANDLES)}', 'urn': code}
+            else:
+                details = {'method': 'netbanking', 'bank_name': random.choice(BANKS),
+                           'account_masked': f'****{random.randint(0, 9999):04d}', 'reference': code}
+            variants.append(json.dumps(details))
+        pool[method_type] = variants
+    return pool
+
+def csv_chunks(rows):
+    """Render rows as CSV text, CHUNK_ROWS at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count == CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    if count:
+        yield buffer.getvalue()
+
+def user_rows(args, start, stop, now):
+    """nexus_users rows for user numbers [start, stop): merchants first, then customers"""
+    for n in range(start, stop):
+        created = (now - timedelta(days=args.days + random.random() * 365)).isoformat(sep=' ')
+        if n < args.merchants:
+            user_id = merchant_id(n)
+            yield (user_id, f'Seed Merchant {n}', f'{user_id}@merchant.example.com',
+                   f'80{n:08d}', 'merchant', created, created)
+        else:
+            c = n - args.merchants
+            user_id = customer_id(c)
+            yield (user_id, f'Seed Customer {c}', f'{user_id}@example.com',
+                   f'9{c:09d}', 'customer', created, created)
+
+def wallet_rows(args, start, stop, now):
+    """nexus_wallets rows, one per seeded user"""
+    stamp = now.isoformat(sep=' ')
+    for n in range(start, stop):
+        if n < args.merchants:
+            user_id = merchant_id(n)
+            balance = random.lognormvariate(12, 1.5)
+        else:
+            user_id = customer_id(n - args.merchants)
+            balance = random.lognormvariate(9, 1)
+        yield (f'PXW{n:012d}', user_id, f'{balance:.2f}', 'INR', 'active', stamp, stamp)
+
+class TransactionStream:
+    """
+    Time-ordered synthetic payments. Timestamps advance by exponential
+    inter-arrival gaps so the load spans --days ending now, and transaction
+    IDs use the app's Snowflake layout so they sort like live ones.
+    """
+
+    def __init__(self, args, start_ms, end_ms, app):
+        self.args = args
+        self.app = app
+        self.clock_ms = float(start_ms)
+        self.end_ms = end_ms
+        self.last_ms = 0
+        self.sequence = 0
+        self.mean_gap_ms = args.days * 86400000 / max(args.transactions, 1)
+        self.customers = args.users
+        self.hot_weights = zipf_cum_weights(args.merchants)
+        self.merchant_ranks = range(args.merchants)
+        # Percentage mixes expanded to 100-slot tables: random.choice is far
+        # cheaper per row than random.choices with weights
+        self.methods = [m for m, weight in METHOD_MIX for _ in range(weight)]
+        self.statuses = [s for s, weight in STATUS_MIX for _ in range(weight)]
+        self.details = method_details_pool()
+        self.refunds = []
+
+    def next_code(self, timestamp_ms):
+        if timestamp_ms <= self.last_ms:
+            self.sequence += 1
+            if self.sequence >> self.app.SnowflakeGenerator.SEQUENCE_BITS:
+                self.last_ms += 1
+                self.sequence = 0
+        else:
+            self.last_ms = timestamp_ms
+            self.sequence = 0
+        value = self.app.SnowflakeGenerator.compose(self.last_ms, SEED_WORKER_ID, self.sequence)
+        return self.app.SnowflakeGenerator.encode(value, 'PXS')
+
+    def rows(self, count):
+        """Yield count nexus_transactions rows; refunds are collected in self.refunds"""
+        args = self.args
+        for _ in range(count):
+            self.clock_ms += random.expovariate(1.0 / self.mean_gap_ms)
+            # Random gaps can overshoot the span slightly; never date rows in the future
+            timestamp_ms = min(int(self.clock_ms), self.end_ms)
+            transaction_id = self.next_code(timestamp_ms)
+            timestamp = datetime.fromtimestamp(timestamp_ms / 1000)
+
+            sender_n = power_law_index(self.customers, args.sender_skew)
+            sender_id = customer_id(sender_n)
+            if random.random() < MERCHANT_SHARE:
+                receiver_id = merchant_id(random.choices(self.merchant_ranks, cum_weights=self.hot_weights)[0])
+            else:
+                receiver_n = random.randrange(self.customers - 1)
+                receiver_id = customer_id(receiver_n + (receiver_n >= sender_n))
+
+            method_type = random.choice(self.methods)
+            status = random.choice(self.statuses)
+            amount = f'{min(max(random.lognormvariate(6.5, 1.2), 1), 99999):.2f}'
+
+            refunded, refund_id, refund_timestamp = False, None, None
+            if status == 'success' and random.random() < args.refund_rate:
+                refunded = True
+                refund_id = 'REF' + transaction_id[3:]
+                refund_timestamp = (timestamp + timedelta(hours=random.uniform(1, 72))).isoformat(sep=' ')
+                self.refunds.append((refund_id, transaction_id, amount, random.choice(REFUND_REASONS),
+                                     'processed', refund_timestamp))
+
+            yield (transaction_id, sender_id, receiver_id, amount, method_type,
+                   random.choice(self.details[method_type]), status, refunded, refund_id,
+                   refund_timestamp, timestamp.isoformat(sep=' '), random.choice(DESCRIPTIONS))
+
+# ============================================
+# LOADING
+# ============================================
+
+SECONDARY_INDEXES = ['idx_transactions_sender_ts', 'idx_transactions_receiver_ts',
+                     'idx_transactions_refundable', 'idx_transactions_ts',
+                     'idx_refunds_transaction_id', 'idx_wallets_user_id']
+
+def collect_ids(rows, ids):
+    """Pass rows through unchanged, appending each row's ID (first column) to ids"""
+    for row in rows:
+        ids.append(row[0])
+        yield row
+
+def copy_in(conn, table, columns, rows):
+    """Stream rows into table with COPY FROM STDIN in CSV format"""
+    conn.run(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", stream=csv_chunks(rows))
+
+def load_batches(conn, label, total, batch_size, load):
+    """Call load(start, stop) per batch, committing each and reporting throughput"""
+    started = time.monotonic()
+    for start in range(0, total, batch_size):
+        stop = min(start + batch_size, total)
+        load(start, stop)
+        conn.commit()
+        elapsed = time.monotonic() - started
+        print(f"   {label}: {stop:,}/{total:,} ({stop / elapsed:,.0f} rows/s)")
+    return time.monotonic() - started
+
+def main():
+    parser = argparse.ArgumentParser(description='Pexus bulk data seeder')
+    parser.add_argument('--database-url', required=True, help='Database to seed (schema is created if missing)')
+    parser.add_argument('--users', type=int, default=100000, help='Customers to create (default 100000)')
+    parser.add_argument('--merchants', type=int, default=2000, help='Merchants to create (default 2000)')
+    parser.add_argument('--transactions', type=int, default=1000000, help='Transactions to create (default 1000000)')
+    parser.add_argument('--days', type=float, default=180, help='History span ending now, in days (default 180)')
+    parser.add_argument('--refund-rate', type=float, default=0.02, help='Share of successful payments refunded (default 0.02)')
+    parser.add_argument('--sender-skew', type=float, default=3.0,
+                        help='Power-law exponent for sender choice; higher concentrates traffic (default 3)')
+    parser.add_argument('--batch-size', type=int, default=500000, help='Rows per COPY and commit (default 500000)')
+    parser.add_argument('--keep-indexes', action='store_true', help='Load with secondary indexes in place')
+    parser.add_argument('--seed', type=int, help='Random seed for repeatable data')
+    args = parser.parse_args()
+
+    if args.users < 2 or args.merchants < 1:
+        raise SystemExit('Need at least 2 users and 1 merchant')
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    os.environ['DATABASE_URL'] = args.database_url
+    os.environ['PEXUS_INIT_MODE'] = 'eager'
+    sys.path.insert(0, REPO_ROOT)
+    import app  # creates the schema and runs migrations on import (eager init)
+
+    conn = app.open_db_connection()
+    try:
+        if conn.run("SELECT 1 FROM nexus_users WHERE user_id LIKE 'seed\\_%' LIMIT 1"):
+            raise SystemExit('Database already contains seeded users; seed a fresh database')
+
+        if not args.keep_indexes:
+            print('🔧 Dropping secondary indexes for the load')
+            conn.autocommit = True
+            for name in SECONDARY_INDEXES:
+                conn.run(f'DROP INDEX IF EXISTS {name}')
+            conn.autocommit = False
+
+        now = datetime.now()
+        total_users = args.merchants + args.users
+        started = time.monotonic()
+
+        print(f'👤 {total_users:,} users and wallets')
+        load_batches(conn, 'users', total_users, args.batch_size, lambda start, stop: copy_in(
+            conn, 'nexus_users',
+            ['user_id', 'name', 'email', 'phone', 'user_type', 'created_at', 'updated_at'],
+            user_rows(args, start, stop, now)))
+        load_batches(conn, 'wallets', total_users, args.batch_size, lambda start, stop: copy_in(
+            conn, 'nexus_wallets',
+            ['wallet_id', 'user_id', 'balance', 'currency', 'status', 'created_at', 'updated_at'],
+            wallet_rows(args, start, stop, now)))
+
+        print(f'💸 {args.transactions:,} transactions')
+        cursor = conn.cursor()
+        if app.is_partitioned(cursor):
+            created = app.ensure_transaction_partitions(cursor, start=now - timedelta(days=args.days))
+            conn.commit()
+            print(f'   partitions: {len(created)} created')
+        end_ms = int(now.timestamp() * 1000)
+        stream = TransactionStream(args, end_ms - int(args.days * 86400000), end_ms, app)
+
+        def load_transactions(start, stop):
+            # Rows stream straight into COPY; only their IDs are kept for the
+            # registry, which refunds reference, so it is loaded before them
+            ids = []
+            copy_in(conn, 'nexus_transactions',
+                    ['transaction_id', 'sender_id', 'receiver_id', 'amount', 'method_type', 'method_details',
+                     'status', 'refunded', 'refund_id', 'refund_timestamp', 'timestamp', 'description'],
+                    collect_ids(stream.rows(stop - start), ids))
+            copy_in(conn, 'nexus_transaction_ids', ['transaction_id'], ((i,) for i in ids))
+            if stream.refunds:
+                copy_in(conn, 'nexus_refunds',
+                        ['refund_id', 'transaction_id', 'amount', 'reason', 'status', 'timestamp'],
+                        stream.refunds)
+                stream.refunds = []
+
+        load_batches(conn, 'transactions', args.transactions, args.batch_size, load_transactions)
+
+        print('🧮 Rebuilding counters, per-user stats and analytics')
+        app.rebuild_counters(cursor)
+        app.rebuild_user_stats(cursor)
+        app.rebuild_analytics(cursor)
+        conn.commit()
+
+        conn.autocommit = True
+        if not args.keep_indexes:
+            print('🔧 Rebuilding secondary indexes')
+            index_started = time.monotonic()
+            app.migrate_hot_path_indexes(cursor)
+            print(f'   indexes: {time.monotonic() - index_started:.1f}s')
+        print('📊 ANALYZE')
+        for table in ['nexus_users', 'nexus_wallets', 'nexus_transactions', 'nexus_refunds']:
+            cursor.execute(f'ANALYZE {table}')
+        cursor.close()
+
+        elapsed = time.monotonic() - started
+        rows = total_users * 2 + args.transactions
+        print(f'✅ Seeded {rows:,}+ rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s overall)')
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Pexus Payment Gateway - Cold Start Benchmark
+Measures what a serverless cold start pays before the first response: a
+fresh interpreter imports app.py and serves one request through the Flask
+test client. Runs each PEXUS_INIT_MODE several times and reports medians of
+the import time, the first response time and the whole process.
+
+Usage:
+    python bench/startup.py
+    python bench/startup.py --database-url postgresql://postgres@localhost:5432/pexus_bench?sslmode=disable --runs 10
+
+The schema is created once up front, so runs model a cold start against an
+already-initialized database.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from loadtest import REPO_ROOT, LocalPostgres
+
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get(sys.argv[1])
+responded = time.perf_counter()
+print(json.dumps({'status': response.status_code,
+                  'import': imported - started,
+                  'first_response': responded - imported}))
+'''
+
+def run_probe(database_url, mode, path):
+    """One cold start in a fresh interpreter; returns its timings in seconds"""
+    env = dict(os.environ, DATABASE_URL=database_url, PEXUS_INIT_MODE=mode, PEXUS_LOG_LEVEL='WARNING')
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', PROBE, path], cwd=REPO_ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['process'] = time.perf_counter() - started
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description='Pexus cold start benchmark')
+    parser.add_argument('--database-url', help='Existing database to use (default: throwaway local cluster)')
+    parser.add_argument('--runs', type=int, default=5, help='Cold starts per mode (default 5)')
+    parser.add_argument('--path', default='/', help='Route for the first request (default /)')
+    parser.add_argument('--modes', default='lazy,eager', help='PEXUS_INIT_MODE values to compare (default lazy,eager)')
+    args = parser.parse_args()
+
+    postgres = None
+    database_url = args.database_url
+    results = {}
+    try:
+        if not database_url:
+            postgres = LocalPostgres()
+            postgres.start()
+            database_url = postgres.url
+
+        run_probe(database_url, 'eager', args.path)  # Create the schema
+        for mode in args.modes.split(','):
+            runs = [run_probe(database_url, mode, args.path) for _ in range(args.runs)]
+            results[mode] = {key: statistics.median(r[key] for r in runs)
+                             for key in ('import', 'first_response', 'process')}
+            results[mode]['status'] = runs[-1]['status']
+    finally:
+        if postgres:
+            postgres.stop()
+
+    print(f"{'Mode':<8} {'Import ms':>10} {'First resp ms':>14} {'Process ms':>11} {'Status':>7}")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['import'] * 1000:>10.1f} {r['first_response'] * 1000:>14.1f} "
+              f"{r['process'] * 1000:>11.1f} {r['status']:>7}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())